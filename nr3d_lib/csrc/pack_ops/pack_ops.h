@@ -41,7 +41,7 @@ enum class PackBinaryOpType {
 at::Tensor packed_add(at::Tensor feats, at::Tensor other, at::Tensor pack_infos);
 at::Tensor packed_sub(at::Tensor feats, at::Tensor other, at::Tensor pack_infos);
 at::Tensor packed_mul(at::Tensor feats, at::Tensor other, at::Tensor pack_infos);
-at::Tensor packed_div(at::Tensor feats, at::Tensor other, at::Tensor pack_infos);
+at::Tensor packed_div(at::Tensor feats, at::Tensor other, at::Tensor pack_infos, double eps);
 at::Tensor packed_matmul(at::Tensor feats, at::Tensor other, at::Tensor pack_infos);
 at::Tensor packed_gt(at::Tensor feats, at::Tensor other, at::Tensor pack_infos);
 at::Tensor packed_geq(at::Tensor feats, at::Tensor other, at::Tensor pack_infos);
@@ -49,7 +49,7 @@ at::Tensor packed_lt(at::Tensor feats, at::Tensor other, at::Tensor pack_infos);
 at::Tensor packed_leq(at::Tensor feats, at::Tensor other, at::Tensor pack_infos);
 at::Tensor packed_eq(at::Tensor feats, at::Tensor other, at::Tensor pack_infos);
 at::Tensor packed_neq(at::Tensor feats, at::Tensor other, at::Tensor pack_infos);
-at::Tensor packed_binary_ops(at::Tensor feats, at::Tensor other, at::Tensor pack_infos, PackBinaryOpType op);
+at::Tensor packed_binary_ops(at::Tensor feats, at::Tensor other, at::Tensor pack_infos, PackBinaryOpType op, double eps = 0.0);
 
 at::Tensor packed_sort_qsort(at::Tensor vals, at::Tensor pack_infos, bool return_idx);
 at::Tensor packed_sort_thrust(at::Tensor vals, at::Tensor pack_infos, bool return_idx);
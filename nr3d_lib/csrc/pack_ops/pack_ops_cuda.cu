@@ -10,6 +10,7 @@
 #include <cuda_runtime.h>
 
 #include <ATen/cuda/CUDAContext.h>
+#include <ATen/AccumulateType.h>
 #include <c10/cuda/CUDAGuard.h>
 #include <torch/torch.h>
 
@@ -812,14 +813,16 @@ __global__ void kernel_packed_sum(
 
     uint32_t begin = pack_infos[tidx * 2];
     uint32_t end = begin + pack_infos[tidx * 2 + 1];
-    scalar_t result;
+    // NOTE: Accumulate half / bfloat16 inputs in float
+    using acc_t = at::acc_type<scalar_t, true>;
+    acc_t result;
     // For loop on feat_dim first.
     for (uint32_t j=0; j<feat_dim; ++j) {
-        result = feats_in[begin * feat_dim + j];
+        result = static_cast<acc_t>(feats_in[begin * feat_dim + j]);
         for (uint32_t i=begin+1; i < end; ++i) {
-            result += feats_in[i * feat_dim + j];
+            result += static_cast<acc_t>(feats_in[i * feat_dim + j]);
         }
-        feats_out[tidx * feat_dim + j] = result;
+        feats_out[tidx * feat_dim + j] = static_cast<scalar_t>(result);
     }
 }
 
@@ -848,7 +851,7 @@ at::Tensor packed_sum(
 
     static constexpr uint32_t num_threads = 256;
 
-    AT_DISPATCH_ALL_TYPES_AND_HALF(feats.scalar_type(), "packed_sum", ([&] {
+    AT_DISPATCH_ALL_TYPES_AND2(at::ScalarType::Half, at::ScalarType::BFloat16, feats.scalar_type(), "packed_sum", ([&] {
         const at::cuda::OptionalCUDAGuard device_guard(at::device_of(feats_out));
         auto stream = at::cuda::getCurrentCUDAStream();
         kernel_packed_sum<scalar_t><<<div_round_up((uint32_t)num_packs, num_threads), num_threads, 0, stream>>>(
@@ -2044,6 +2047,7 @@ __global__ void kernel_packed_div(
     const scalar_t* __restrict__ feats_in, // [num_feats, feat_dim]
     const scalar_t* __restrict__ other_in, // [num_packs, feat_dim]
     const int64_t* __restrict__ pack_infos, 
+    const scalar_t eps, // Added to `other` before division
     // Outputs
     scalar_t* __restrict__ feats_out
 ) {
@@ -2055,8 +2059,9 @@ __global__ void kernel_packed_div(
     uint32_t end = begin + pack_infos[tidx * 2 + 1];
     // For loop on feat_dim first.
     for (uint32_t j=0; j<feat_dim; ++j) {
+        const scalar_t denom = other_in[j] + eps;
         for (uint32_t i=begin; i < end; ++i) {
-            feats_out[i * feat_dim + j] = feats_in[i * feat_dim + j] / other_in[j];
+            feats_out[i * feat_dim + j] = feats_in[i * feat_dim + j] / denom;
         }
     }
 }
@@ -2252,7 +2257,8 @@ at::Tensor packed_binary_ops(
     at::Tensor feats, // [num_feats, feat_dim] or [num_feats]
     at::Tensor other, // [num_packs, ...]
     at::Tensor pack_infos, // [num_packs, 2]
-    PackBinaryOpType op
+    PackBinaryOpType op, 
+    double eps // Only used by division
 ) {
 	at::TensorArg feats_arg(feats, "feats", 1);
 	at::TensorArg other_arg(other, "other", 2);
@@ -2357,7 +2363,7 @@ at::Tensor packed_binary_ops(
             AT_DISPATCH_ALL_TYPES_AND_HALF(feats.scalar_type(), "packed_div", ([&] {
                 kernel_packed_div<scalar_t><<<div_round_up((uint32_t)num_packs, num_threads), num_threads, 0, stream>>>(
                     num_packs, num_feats, feat_dim, 
-                    feats.data_ptr<scalar_t>(), other.data_ptr<scalar_t>(), pack_infos_ptr, feats_out.data_ptr<scalar_t>()
+                    feats.data_ptr<scalar_t>(), other.data_ptr<scalar_t>(), pack_infos_ptr, (scalar_t)eps, feats_out.data_ptr<scalar_t>()
                 );
             }));
         }
@@ -2475,9 +2481,10 @@ at::Tensor packed_mul(
 at::Tensor packed_div(
     at::Tensor feats, // [num_feats, feat_dim] or [num_feats]
     at::Tensor other, // [num_packs, feat_dim] or [num_packs]
-    at::Tensor pack_infos // [num_packs, 2]
+    at::Tensor pack_infos, // [num_packs, 2]
+    double eps
 ) {
-    return packed_binary_ops(feats, other, pack_infos, PackBinaryOpType::Division);
+    return packed_binary_ops(feats, other, pack_infos, PackBinaryOpType::Division, eps);
 }
 
 at::Tensor packed_matmul(
@@ -140,10 +140,15 @@ def neus_ray_query_coarse_multi_upsample(
     upsample_mode: str = 'multistep_estimate', num_fine: int = 64, 
     upsample_inv_s: float = 64., upsample_s_divisor: float = 1.0, 
     upsample_inv_s_factors: List[int] = [1, 2, 4, 8], upsample_use_estimate_alpha=False,  # For upsample_mode = multistep_estimate
-    num_nograd: int = 1024, chunksize_query: int = 2**24 # For upsample_mode = direct_more
+    num_nograd: int = 1024, chunksize_query: int = 2**24, # For upsample_mode = direct_more
+    extra_query_x: torch.Tensor = None, 
     ) -> Tuple[dict, dict]:
     """
     Vanilla NeuS ray query mode
+    
+    `extra_query_x`: Optional [num_rays, 3] extra per-ray points (e.g. near points) whose SDF is queried \
+        together with the interval boundary points in the same network launch. \
+        The result is returned as details['extra_query_sdf'] of shape [num_rays].
     """
     assert hasattr(model, 'forward'), "model.forward() is requried"
     assert hasattr(model, 'forward_sdf'), "model.forward_sdf() is requried"
@@ -275,13 +280,19 @@ def neus_ray_query_coarse_multi_upsample(
     d_all = upsample()
     d_mid = 0.5 * (d_all[..., 1:] + d_all[..., :-1])
     fwd_kwargs = dict(x=torch.addcmul(rays_o.unsqueeze(-2), rays_d.unsqueeze(-2), d_all.unsqueeze(-1)))
+    if extra_query_x is not None:
+        # NOTE: Append as one more sample per ray; sliced off right after the network query.
+        fwd_kwargs['x'] = torch.cat([fwd_kwargs['x'], extra_query_x.unsqueeze(-2)], dim=-2)
     if use_ts: fwd_kwargs['ts'] = rays_ts.unsqueeze(-1).expand(*fwd_kwargs['x'].shape[:-1]).contiguous()
     if use_fidx: fwd_kwargs['fidx'] = rays_fidx.unsqueeze(-1).expand(*fwd_kwargs['x'].shape[:-1]).contiguous()
     if use_bidx: fwd_kwargs['bidx'] = rays_bidx.unsqueeze(-1).expand(*fwd_kwargs['x'].shape[:-1]).contiguous()
     if fwd_sdf_use_pix: fwd_kwargs['pix'] = rays_pix.unsqueeze(-2).expand(*fwd_kwargs['x'].shape[:-1], -1).contiguous()
     if fwd_sdf_use_h_appear: fwd_kwargs['h_appear'] = rays_h_appear.unsqueeze(-2).expand(*fwd_kwargs['x'].shape[:-1], -1).contiguous()
     if fwd_sdf_use_view_dirs: fwd_kwargs['v'] = view_dirs.unsqueeze(-2).expand(*fwd_kwargs['x'].shape[:-1], -1).contiguous()
-    alpha = neus_ray_sdf_to_alpha(model.forward_sdf(**fwd_kwargs)['sdf'], forward_inv_s) # The same shape with d_mid
+    sdf = model.forward_sdf(**fwd_kwargs)['sdf']
+    if extra_query_x is not None:
+        sdf, extra_query_sdf = sdf[..., :-1], sdf[..., -1]
+    alpha = neus_ray_sdf_to_alpha(sdf, forward_inv_s) # The same shape with d_mid
     
     if compression:
         # NOTE: `pack_infos` is for all `ray_tested` rays / `rays_inds` / `num_rays`
@@ -289,7 +300,7 @@ def neus_ray_query_coarse_multi_upsample(
         nidx_useful, pack_infos_useful, pidx_useful = packed_volume_render_compression(alpha.flatten(), pack_infos)
         
         if nidx_useful.numel() == 0:
-            return empty_volume_buffer, {}
+            return empty_volume_buffer, ({} if extra_query_x is None else {'extra_query_sdf': extra_query_sdf})
         else:
             depths_packed, alpha_packed = d_mid.flatten()[pidx_useful], alpha.flatten()[pidx_useful]
             volume_buffer = dict(
@@ -323,6 +334,7 @@ def neus_ray_query_coarse_multi_upsample(
                 if "rgb" in net_out: volume_buffer["rgb"] = net_out["rgb"].to(dtype)
             details = {'render.num_per_ray0': d_mid.size(-1), 
                        'render.num_per_ray': pack_infos_useful[:, 1]}
+            if extra_query_x is not None: details['extra_query_sdf'] = extra_query_sdf
             return volume_buffer, details
     else: # not compression
         volume_buffer = dict(
@@ -353,6 +365,7 @@ def neus_ray_query_coarse_multi_upsample(
             if "nablas" in net_out: volume_buffer["nablas"] = net_out["nablas"].to(dtype)
             if "rgb" in net_out: volume_buffer["rgb"] = net_out["rgb"].to(dtype)
         details = {'render.num_per_ray': d_mid.size(-1)}
+        if extra_query_x is not None: details['extra_query_sdf'] = extra_query_sdf
         return volume_buffer, details
 
 def neus_ray_query_march_occ_multi_upsample(
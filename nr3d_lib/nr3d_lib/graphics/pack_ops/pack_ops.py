@@ -23,6 +23,7 @@ __all__ = [
     #---- packed reduce
     'packed_sum', 
     'packed_mean', 
+    'packed_weighted_mean', 
     #---- per-pack math
     'packed_cumprod', 
     'packed_cumsum', 
@@ -118,6 +119,30 @@ def packed_sum(feats: torch.Tensor, pack_infos: torch.LongTensor) -> torch.Tenso
 def packed_mean(feats: torch.Tensor, pack_infos: torch.LongTensor) -> torch.Tensor:
     return packed_sum(feats, pack_infos) / (pack_infos[:, 1]+1e-8)
 
+def packed_weighted_mean(
+    vals: torch.Tensor, weights: torch.Tensor, pack_infos: torch.LongTensor, 
+    eps: float = 0., weights_sum: torch.Tensor = None) -> torch.Tensor:
+    """ Per-pack sum(w*v) / (sum(w)+eps), without materializing the normalized weights
+    
+    Args:
+        vals (torch.Tensor): [num_packed, ...] Packed values
+        weights (torch.Tensor): [num_packed] Packed weights
+        pack_infos (torch.LongTensor): [num_packs, 2] Pack infos
+        eps (float, optional): Added to the per-pack weight sum. Defaults to 0.
+        weights_sum (torch.Tensor, optional): [num_packs] Reuse an already reduced sum(w) if given. Defaults to None.
+
+    Returns:
+        torch.Tensor: [num_packs, ...] The per-pack weighted mean
+    """
+    wv = weights.unsqueeze(-1) * vals.view(vals.shape[0], -1)
+    if weights_sum is None:
+        # NOTE: Reduce [w*v, w] in the same packed_sum pass
+        s = packed_sum(torch.cat([wv, weights.unsqueeze(-1)], dim=-1), pack_infos)
+        wv_sum, weights_sum = s[:, :-1], s[:, -1]
+    else:
+        wv_sum = packed_sum(wv, pack_infos)
+    return (wv_sum / (weights_sum.unsqueeze(-1) + eps)).view(-1, *vals.shape[1:])
+
 class PackedCumprod(torch.autograd.Function):
     # Remove everytime .nonzero() calculation
     @staticmethod
@@ -359,37 +384,40 @@ def packed_mul(feats: torch.Tensor, other: torch.Tensor, pack_infos: torch.LongT
 
 class PackedDiv(torch.autograd.Function):
     @staticmethod
-    def forward(ctx, feats, other, pack_infos):
+    def forward(ctx, feats, other, pack_infos, eps: float = 0.):
         if ctx.needs_input_grad[0] or ctx.needs_input_grad[1]:
             ctx.save_for_backward(feats, other, pack_infos)
-        return _backend.packed_div(feats, other, pack_infos)
+            ctx.eps = eps
+        return _backend.packed_div(feats, other, pack_infos, eps)
     @staticmethod
     @once_differentiable
     def backward(ctx, grad_out):
         if grad_out is None:
-            return None, None, None
+            return None, None, None, None
         grad_in = None
         grad_other = None
         feats, other, pack_infos = ctx.saved_tensors
         if ctx.needs_input_grad[0]:
-            grad_in = _backend.packed_div(grad_out, other, pack_infos)
+            grad_in = _backend.packed_div(grad_out, other, pack_infos, ctx.eps)
         if ctx.needs_input_grad[1]:
-            # -feats/(other * other)
-            grad_other = _backend.packed_div(-grad_out*feats, other*other, pack_infos)
+            # -feats/((other+eps) * (other+eps))
+            other_eps = other + ctx.eps
+            grad_other = _backend.packed_div(-grad_out*feats, other_eps*other_eps, pack_infos, 0.)
             grad_other = _backend.packed_sum(grad_other, pack_infos)
-        return grad_in, grad_other, None
-def packed_div(feats: torch.Tensor, other: torch.Tensor, pack_infos: torch.LongTensor):
-    """ Calculate pack-wise division: feats / other
+        return grad_in, grad_other, None, None
+def packed_div(feats: torch.Tensor, other: torch.Tensor, pack_infos: torch.LongTensor, eps: float = 0.):
+    """ Calculate pack-wise division: feats / (other + eps)
 
     Args:
         feats (torch.Tensor): [num_feats(, feat_dim)]
         other (torch.Tensor): [num_packs(, feat_dim)]
         pack_infos (torch.LongTensor): [num_packs, 2]
+        eps (float, optional): Added to `other` inside the kernel, avoiding an extra temporary. Defaults to 0.
 
     Returns:
         torch.Tensor: Pack-wise division resutls
     """
-    return PackedDiv.apply(feats.contiguous(), other.contiguous(), pack_infos.contiguous())
+    return PackedDiv.apply(feats.contiguous(), other.contiguous(), pack_infos.contiguous(), eps)
 
 def packed_matmul(feats: torch.Tensor, other: torch.Tensor, pack_infos: torch.LongTensor) -> torch.Tensor:
     """ Calculate pack-wise left-multiplication: results = other @ feat
@@ -292,6 +292,65 @@ if __name__ == "__main__":
             globals={'feats':feats, 'other':other, 'pack_infos':pack_infos}
         ).blocked_autorange())
 
+    def test_packed_div_eps(device=torch.device('cuda')):
+        eps = 1.0e-3
+        n_per_pack = torch.randint(32, 96, [4096], device=device)
+        pack_infos = get_pack_infos_from_n(n_per_pack)
+        feats = torch.randn([pack_infos[-1].sum().item()], device=device, requires_grad=True)
+        other = torch.rand([4096], device=device, requires_grad=True)
+        
+        y1 = packed_div(feats, other, pack_infos, eps=eps)
+        y2 = feats / (torch.repeat_interleave(other, pack_infos[:,1], dim=0) + eps)
+        print(torch.allclose(y1, y2))
+        
+        grad = torch.randn(feats.shape, device=device)
+        grad_feats_1, grad_other_1 = torch.autograd.grad(y1, [feats, other], grad)
+        grad_feats_2, grad_other_2 = torch.autograd.grad(y2, [feats, other], grad)
+        print(torch.allclose(grad_feats_1, grad_feats_2, atol=1e-5))
+        print(torch.allclose(grad_other_1, grad_other_2, atol=0, rtol=1.0e-2))
+        
+        # Numerical check of the hand-written backward (incl. the `(other+eps)^2` term)
+        n_per_pack = torch.tensor([3,1,2,1], device=device, dtype=torch.long)
+        pack_infos = get_pack_infos_from_n(n_per_pack)
+        feats = torch.randn([n_per_pack.sum().item()], device=device, dtype=torch.double, requires_grad=True)
+        other = torch.rand([4], device=device, dtype=torch.double, requires_grad=True)
+        print(torch.autograd.gradcheck(lambda f, o: packed_div(f, o, pack_infos, eps=eps), (feats, other)))
+
+    def test_packed_weighted_mean(device=torch.device('cuda')):
+        eps = 1.0e-10
+        n_per_pack = torch.randint(32, 96, [4096], device=device)
+        pack_infos = get_pack_infos_from_n(n_per_pack)
+        num_feats = pack_infos[-1].sum().item()
+        vals = torch.randn([num_feats], device=device, requires_grad=True)
+        weights = torch.rand([num_feats], device=device, requires_grad=True)
+        
+        def ref(vals, weights):
+            weights_sum = packed_sum(weights, pack_infos)
+            return packed_sum(packed_div(weights, weights_sum, pack_infos, eps=eps) * vals, pack_infos)
+        
+        grad = torch.randn([4096], device=device)
+        y0 = ref(vals, weights)
+        grad_vals_0, grad_weights_0 = torch.autograd.grad(y0, [vals, weights], grad)
+        
+        # `weights_sum=None`: [w*v, w] reduced together
+        y1 = packed_weighted_mean(vals, weights, pack_infos, eps=eps)
+        grad_vals_1, grad_weights_1 = torch.autograd.grad(y1, [vals, weights], grad)
+        print(torch.allclose(y0, y1, atol=1e-5))
+        print(torch.allclose(grad_vals_0, grad_vals_1, atol=1e-5))
+        print(torch.allclose(grad_weights_0, grad_weights_1, atol=1e-5))
+        
+        # Reusing an already reduced `weights_sum`
+        y2 = packed_weighted_mean(vals, weights, pack_infos, eps=eps, weights_sum=packed_sum(weights, pack_infos))
+        grad_vals_2, grad_weights_2 = torch.autograd.grad(y2, [vals, weights], grad)
+        print(torch.allclose(y0, y2, atol=1e-5))
+        print(torch.allclose(grad_vals_0, grad_vals_2, atol=1e-5))
+        print(torch.allclose(grad_weights_0, grad_weights_2, atol=1e-5))
+        
+        # Multi-channel values
+        vals3 = torch.randn([num_feats, 3], device=device)
+        y3 = packed_weighted_mean(vals3, weights, pack_infos, eps=eps)
+        print(torch.allclose(y3, packed_sum(packed_div(weights, packed_sum(weights, pack_infos), pack_infos, eps=eps).unsqueeze(-1) * vals3, pack_infos), atol=1e-5))
+
     def test_packed_binary_ops_compare(device=torch.device('cuda')):
         from torch.utils.benchmark import Timer
         n_per_pack = torch.randint(32, 96, [4096], device=device)
@@ -1254,6 +1313,8 @@ if __name__ == "__main__":
     # test_backward_diff()
     # test_packed_search_sorted()
     # test_packed_binary_ops_arithmetic()
+    # test_packed_div_eps()
+    # test_packed_weighted_mean()
     # test_packed_binary_ops_compare()
     # test_packed_matmul()
     # test_n_per_pack_t()
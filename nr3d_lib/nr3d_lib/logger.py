@@ -19,7 +19,7 @@ import torch.distributed as dist
 
 from nr3d_lib.fmt import log
 from nr3d_lib.plot import figure_to_image
-from nr3d_lib.utils import cond_mkdir, is_scalar, nested_dict_items, tensor_statistics
+from nr3d_lib.utils import cond_mkdir, is_scalar, lazy_scalar, nested_dict_items, tensor_statistics
 
 try:
     # NOTE: Since torch 1.2
@@ -164,7 +164,7 @@ class Logger(object):
                     self.add(category, f"{k_prefix}{'.' if k_prefix and not k_prefix.endswith('.') else ''}{key}", _v, it)
             elif is_scalar(v):
                 key = '.'.join(k)
-                self.add(category, f"{k_prefix}{'.' if k_prefix and not k_prefix.endswith('.') else ''}{key}", v.item() if not isinstance(v, Number) else v, it)
+                self.add(category, f"{k_prefix}{'.' if k_prefix and not k_prefix.endswith('.') else ''}{key}", lazy_scalar(v), it)
 
     def add_mesh(self, category: str, k: str, verts: torch.Tensor, *, faces: torch.Tensor = None, colors: torch.Tensor = None, it: int = ...):
         self.last_step = it
@@ -12,6 +12,7 @@ import torch.nn as nn
 import torch.nn.functional as F
 
 from nr3d_lib.logger import Logger
+from nr3d_lib.models.accelerations.utils import morton_encode3
 from .utils import *
 
 class OccGridEma(nn.Module):
@@ -26,10 +27,12 @@ class OccGridEma(nn.Module):
         occ_thre_consider_mean=False, # Whether consider average value as threshold when binarizing occ_val
         ema_decay: float = 0.95, n_steps_between_update: int = 16, n_steps_warmup: int = 256,
         init_cfg=dict(), update_from_net_cfg = dict(), update_from_samples_cfg = dict(),
+        morton_order=False, # Whether to sample voxels in z-curve order (False: legacy linear order)
         dtype=torch.float, device=None) -> None:
         super().__init__()
     
         self.dtype = dtype
+        self.morton_order = morton_order
         
         if isinstance(resolution, int):
             resolution = [resolution] * self.NUM_DIM
@@ -51,6 +54,7 @@ class OccGridEma(nn.Module):
             ), dim=-1
         ).view(-1,self.NUM_DIM)
         self.register_buffer("gidx_full", gidx_full, persistent=False)
+        self.register_buffer("morton_perm", self._morton_perm(gidx_full), persistent=False)
         
         self._register_load_state_dict_pre_hook(self.before_load_state_dict)
         
@@ -93,6 +97,23 @@ class OccGridEma(nn.Module):
             ), dim=-1
         ).view(-1,self.NUM_DIM)
         self.gidx_full = gidx_full
+        self.morton_perm = self._morton_perm(gidx_full)
+
+    def _morton_perm(self, gidx_full: torch.LongTensor) -> torch.LongTensor:
+        # Sorted once per resolution; `None` when keeping the legacy linear order.
+        return morton_encode3(gidx_full).argsort() if self.morton_order else None
+
+    def _gidx_in_order(self, mask: torch.BoolTensor = None) -> torch.LongTensor:
+        """
+        Voxel indices (optionally only where `mask` is True) in traversal order.
+        With `morton_order`, they follow the z-curve, so that points sampled from them and \
+            the subsequent network queries visit neighboring voxels consecutively.
+        NOTE: The storage of `occ_grid` itself stays row-major, as expected by the ray marching kernels.
+        """
+        if self.morton_perm is None:
+            return self.gidx_full if mask is None else mask.nonzero().long()
+        perm = self.morton_perm if mask is None else self.morton_perm[mask.flatten()[self.morton_perm]]
+        return self.gidx_full[perm]
 
     """ Init """
     @torch.no_grad()
@@ -120,12 +141,12 @@ class OccGridEma(nn.Module):
     def _init_from_net(self, val_query_fn, *, num_steps=4, num_pts: int=2**18):
         for _ in trange(num_steps, desc="Init OCC", leave=False):
             # Sample in non-occupied voxels only (usally its all voxels at the first round).
-            gidx_empty = self.occ_grid.logical_not().nonzero().long()
+            gidx_empty = self._gidx_in_order(self.occ_grid.logical_not())
             if gidx_empty.shape[0] > 0:
-                pts = sample_pts_in_voxels(gidx_empty, num_pts, resolution=self.resolution, dtype=self.dtype)[0]
+                pts = sample_pts_in_voxels(gidx_empty, num_pts, resolution=self.resolution, dtype=self.dtype, sort_vidx=self.morton_order)[0]
                 val = val_query_fn(pts)
                 # No ema here. (ema=1.0)
-                update_occ_val_grid_(self.occ_val_grid, pts, self.occ_val_fn(val), ema_decay=1.0)
+                update_occ_val_grid_(self.occ_val_grid, pts, self.occ_val_fn(val), ema_decay=1.0, resolution=self.resolution)
                 self.occ_grid = binarize(self.occ_val_grid, self.occ_thre, self.occ_thre_consider_mean)
 
     """ Step per iter """
@@ -144,8 +165,9 @@ class OccGridEma(nn.Module):
         self, cur_it: int, val_query_fn, *, num_steps=4, num_pts: int=2**18):
         if cur_it < self.n_steps_warmup:
             pts_list, vals_list = [], []
+            gidx_full = self._gidx_in_order()
             for _ in range(num_steps):
-                pts = sample_pts_in_voxels(self.gidx_full, num_pts, resolution=self.resolution, dtype=self.dtype)[0]
+                pts = sample_pts_in_voxels(gidx_full, num_pts, resolution=self.resolution, dtype=self.dtype, sort_vidx=self.morton_order)[0]
                 val = val_query_fn(pts)
                 pts_list.append(pts)
                 vals_list.append(val)
@@ -156,16 +178,17 @@ class OccGridEma(nn.Module):
             n_in_empty = int(num_pts // 4)
             n_in_nonempty = int(num_pts // 4)
             
-            gidx_nonempty = self.occ_grid.nonzero().long() 
-            gidx_empty = self.occ_grid.logical_not().nonzero().long() 
+            gidx_nonempty = self._gidx_in_order(self.occ_grid)
+            gidx_empty = self._gidx_in_order(self.occ_grid.logical_not())
+            gidx_full = self._gidx_in_order()
             assert gidx_nonempty.numel() > 0, "Occupancy grid becomes empty during training. Your model/algorithm/training settings might be incorrect. Please check configs and tensorboard."
             
             for _ in range(num_steps):
-                _pts_list = [sample_pts_in_voxels(self.gidx_full, n_uniform, resolution=self.resolution, dtype=self.dtype)[0]]
+                _pts_list = [sample_pts_in_voxels(gidx_full, n_uniform, resolution=self.resolution, dtype=self.dtype, sort_vidx=self.morton_order)[0]]
                 if gidx_empty.numel() > 0:
-                    _pts_list.append(sample_pts_in_voxels(gidx_empty, n_in_empty, resolution=self.resolution, dtype=self.dtype)[0])
+                    _pts_list.append(sample_pts_in_voxels(gidx_empty, n_in_empty, resolution=self.resolution, dtype=self.dtype, sort_vidx=self.morton_order)[0])
                 if gidx_nonempty.numel() > 0:
-                    _pts_list.append(sample_pts_in_voxels(gidx_nonempty, n_in_nonempty, resolution=self.resolution, dtype=self.dtype)[0])
+                    _pts_list.append(sample_pts_in_voxels(gidx_nonempty, n_in_nonempty, resolution=self.resolution, dtype=self.dtype, sort_vidx=self.morton_order)[0])
                 pts = torch.cat(_pts_list, dim=0)
                 val = val_query_fn(pts)
                 pts_list.append(pts)
@@ -199,14 +222,14 @@ class OccGridEma(nn.Module):
 
     @torch.no_grad()
     def _collect_samples(self, pts: torch.Tensor, val: torch.Tensor):
-        update_occ_val_grid_(self._occ_val_grid_pcl, pts, self.occ_val_fn(val), ema_decay=1.0)
+        update_occ_val_grid_(self._occ_val_grid_pcl, pts, self.occ_val_fn(val), ema_decay=1.0, resolution=self.resolution)
 
     """ Sampling or querying from the occ grid """
     @torch.no_grad()
     def sample_pts_in_occupied(self, num_pts: int) -> torch.Tensor:
-        gidx_nonempty = self.occ_grid.nonzero().long() 
+        gidx_nonempty = self._gidx_in_order(self.occ_grid)
         assert gidx_nonempty.numel() > 0, "Occupancy grid becomes empty during training. Your model/algorithm/training settings might be incorrect. Please check configs and tensorboard."
-        pts, _ = sample_pts_in_voxels(gidx_nonempty, num_pts, resolution=self.resolution, dtype=self.dtype)
+        pts, _ = sample_pts_in_voxels(gidx_nonempty, num_pts, resolution=self.resolution, dtype=self.dtype, sort_vidx=self.morton_order)
         return pts
 
     @torch.no_grad()
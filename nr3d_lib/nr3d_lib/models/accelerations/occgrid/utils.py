@@ -17,9 +17,10 @@ err_msg_empty_occ = "Occupancy grid becomes empty during training. "\
 """ Sample """
 def sample_pts_in_voxels(
     gidx: torch.LongTensor, num_pts: int, resolution: torch.LongTensor, 
-    device=None, dtype=torch.float) -> Tuple[torch.Tensor, torch.LongTensor]:
+    device=None, dtype=torch.float, sort_vidx=False) -> Tuple[torch.Tensor, torch.LongTensor]:
     """
     Returns the normalized points in range [-1,1] and the voxel index of each sampled point.
+    If `sort_vidx` is True, the sampled points follow the order of `gidx` (e.g. z-curve ordered voxels).
     """
     assert gidx.dim() == 2, f"Only support gidx with shape [N,num_dim]"
     
@@ -28,6 +29,9 @@ def sample_pts_in_voxels(
     num_voxels = gidx.shape[0]
     if num_pts / num_voxels < 2.0:
         vidx = torch.randint(num_voxels, [num_pts, ], device=device)
+        if sort_vidx:
+            # Counting sort: O(num_pts + num_voxels), no comparison sort per call
+            vidx = torch.repeat_interleave(torch.bincount(vidx, minlength=num_voxels), output_size=num_pts)
         offsets = torch.rand([num_pts, num_dim], device=device, dtype=dtype)
         pts = ((gidx[vidx] + offsets) / resolution.float()) * 2 - 1
     else:
@@ -92,7 +96,8 @@ The trailing underscore `_` means that the functions modifies input `occ_val_gri
 def update_occ_val_grid_idx_(occ_val_grid: torch.Tensor, gidx: torch.LongTensor, occ_val: torch.Tensor, ema_decay: float = 1.0):
     resolution_l = occ_val_grid.shape
     occ_val = occ_val.flatten().to(occ_val_grid)
-    gidx_ravel = (gidx * gidx.new_tensor([resolution_l[1] * resolution_l[2], resolution_l[2], 1])).sum(-1)
+    # NOTE: Strides as python scalars; no host-to-device copy
+    gidx_ravel = gidx[..., 0] * (resolution_l[1] * resolution_l[2]) + gidx[..., 1] * resolution_l[2] + gidx[..., 2]
     # 267 us @ 2M pts
     # NOTE: `out` argument also participates in `maximum` reduce.
     #       This is similar to `scatter_reduce_`'s behavior in pytorch 1.12 with `include_self=True`
@@ -100,11 +105,17 @@ def update_occ_val_grid_idx_(occ_val_grid: torch.Tensor, gidx: torch.LongTensor,
     occ_val_new, _ = scatter_max(occ_val, gidx_ravel, out=ema_decay * occ_val_grid.flatten())
     occ_val_grid.index_put_(tuple(gidx.t()), occ_val_new[gidx_ravel])
 
-def update_occ_val_grid_(occ_val_grid: torch.Tensor, pts: torch.FloatTensor, occ_val: torch.Tensor, ema_decay: float = 1.0):
-    device, dtype, resolution_l = occ_val_grid.device, occ_val_grid.dtype, occ_val_grid.shape
-    resolution = torch.tensor([resolution_l], device=device)
+def update_occ_val_grid_(
+    occ_val_grid: torch.Tensor, pts: torch.FloatTensor, occ_val: torch.Tensor, ema_decay: float = 1.0, 
+    resolution: torch.Tensor = None):
+    """
+    `resolution` (optional): The grid resolution already on `occ_val_grid`'s device. 
+        Pass it to keep the update free of host-to-device copies (e.g. when launched on a side stream).
+    """
+    if resolution is None:
+        resolution = torch.tensor([occ_val_grid.shape], device=occ_val_grid.device)
     pts, occ_val = pts.flatten(0, -2), occ_val.flatten().to(occ_val_grid)
-    gidx = ((pts/2. + 0.5) * resolution).long().clamp(resolution.new_tensor([0]), resolution-1)
+    gidx = torch.minimum(((pts/2. + 0.5) * resolution).long().clamp_min_(0), resolution-1)
     update_occ_val_grid_idx_(occ_val_grid, gidx, occ_val, ema_decay=ema_decay)
 
 """ Batched update """
@@ -6,7 +6,8 @@
 
 __all__ = [
     'expand_idx', 
-    'expand_points'
+    'expand_points', 
+    'morton_encode3', 
 ]
 
 from itertools import product
@@ -21,6 +22,28 @@ def expand_idx(idx: torch.LongTensor, dilation: int=1):
     idx = idx.unsqueeze(-2) + cube_3x3x3 * dilation
     return idx
 
+def _expand_bits_21(v: torch.LongTensor) -> torch.LongTensor:
+    # Spread the lower 21 bits of `v` so that there are 2 zero bits between each bit
+    v = v & 0x1fffff
+    v = (v | (v << 32)) & 0x1f00000000ffff
+    v = (v | (v << 16)) & 0x1f0000ff0000ff
+    v = (v | (v << 8)) & 0x100f00f00f00f00f
+    v = (v | (v << 4)) & 0x10c30c30c30c30c3
+    v = (v | (v << 2)) & 0x1249249249249249
+    return v
+
+def morton_encode3(gidx: torch.LongTensor) -> torch.LongTensor:
+    """ Morton (z-curve) code of 3D integer grid indices, by bit-interleaving (supports up to 2^21 per dim)
+
+    Args:
+        gidx (torch.LongTensor): [..., 3] Integer grid indices (ix, iy, iz)
+
+    Returns:
+        torch.LongTensor: [...] Morton codes. Sorting by them gives a z-curve traversal order.
+    """
+    gidx = gidx.long()
+    return _expand_bits_21(gidx[..., 0]) | (_expand_bits_21(gidx[..., 1]) << 1) | (_expand_bits_21(gidx[..., 2]) << 2)
+
 def expand_points(points: torch.Tensor, dilation: float):
     """
     Modified from neucon-w
@@ -18,7 +18,7 @@ from nr3d_lib.models.model_base import ModelMixin
 from nr3d_lib.models.spatial import AABBSpace
 from nr3d_lib.models.accelerations import get_accel, accel_types_single_t
 
-from nr3d_lib.graphics.pack_ops import packed_div, packed_sum
+from nr3d_lib.graphics.pack_ops import packed_sum, packed_weighted_mean
 from nr3d_lib.graphics.nerf import *
 
 
@@ -303,8 +303,7 @@ class NeRFRendererMixin(ModelMixin):
                     rendered['mask_volume'][rays_inds_hit] = vw_sum = packed_sum(vw.view(-1), pack_infos_hit)
                     # [num_samples]
                     if depth_use_normalized_vw:
-                        vw_normalized = packed_div(vw, vw_sum + 1e-10, pack_infos_hit)
-                        rendered['depth_volume'][rays_inds_hit] = packed_sum(vw_normalized * volume_buffer['t'].view(-1), pack_infos_hit)
+                        rendered['depth_volume'][rays_inds_hit] = packed_weighted_mean(volume_buffer['t'].view(-1), vw.view(-1), pack_infos_hit, eps=1e-10, weights_sum=vw_sum)
                     else:
                         rendered['depth_volume'][rays_inds_hit] = packed_sum(vw.view(-1) * volume_buffer['t'].view(-1), pack_infos_hit)
                     if with_rgb:
@@ -190,5 +190,73 @@ class MlpPENeuSModel(NeusRendererMixin, MlpPENeuS):
 if __name__ == "__main__":
     def unit_test(device=torch.device('cuda')):
         pass
+    
+    def make_test_model_and_rays(device=torch.device('cuda'), num_rays: int = 512):
+        model = MlpPENeuSModel(
+            surface_cfg=dict(D=4, W=64, skips=[], bounding_size=2.0), 
+            radiance_cfg=dict(use_view_dirs=True, D=2, W=64), 
+            dtype=torch.float, device=device)
+        model.populate()
+        rays_o = torch.tensor([0., 0., -1.5], device=device).expand(num_rays, 3).contiguous()
+        rays_d = nn.functional.normalize(torch.randn([num_rays, 3], device=device) * 0.2 + rays_o.new_tensor([0., 0., 1.]), dim=-1)
+        return model, dict(rays_o=rays_o, rays_d=rays_d, near=0.1, far=3.0)
+    
+    def test_ray_query_backward(device=torch.device('cuda'), compression=True):
+        # Training-mode `ray_query` with `render_per_obj_individual` scatters grad-requiring values into the outputs
+        # NOTE: compression=False keeps the 'batched' volume buffer; True yields the 'packed' one
+        model, ray_input = make_test_model_and_rays(device)
+        model.train()
+        config = ConfigDict(
+            query_mode='coarse_multi_upsample', 
+            query_param=dict(num_coarse=32, num_fine=16, upsample_inv_s_factors=[1, 2], compression=compression), 
+            with_rgb=True, with_normal=True, perturb=True)
+        ret = model.ray_query(
+            ray_input=ray_input, config=config, 
+            return_details=True, render_per_obj_individual=True)
+        rendered = ret['rendered']
+        loss = sum(rendered[k].mean() for k in ('mask_volume', 'depth_volume', 'rgb_volume', 'normals_volume'))
+        loss.backward()
+        print(all(p.grad is not None for p in model.implicit_surface.parameters() if p.requires_grad))
+        print(all(p.grad is not None for p in model.radiance_net.parameters()))
+    
+    def test_near_sdf(device=torch.device('cuda')):
+        # `near_sdf` from the fused boundary query should match a separate `forward_sdf` on the near points
+        model, ray_input = make_test_model_and_rays(device)
+        model.eval()
+        config = ConfigDict(
+            query_mode='coarse_multi_upsample', 
+            query_param=dict(num_coarse=32, num_fine=16, upsample_inv_s_factors=[1, 2]), 
+            with_rgb=True, with_normal=True, perturb=False, with_near_sdf=True)
+        ray_tested = model.ray_test(**ray_input)
+        with torch.no_grad():
+            ret = model.ray_query(ray_tested=ray_tested, config=config, return_details=True)
+            x_near = torch.addcmul(ray_tested['rays_o'], ray_tested['rays_d'], ray_tested['near'].unsqueeze(-1))
+            near_sdf_ref = model.forward_sdf(x_near)['sdf']
+        print(torch.allclose(ret['details']['near_sdf'], near_sdf_ref, atol=1e-5))
         
-    unit_test()
\ No newline at end of file
+    def test_render_dtype(device=torch.device('cuda'), num_rays: int = 512, num_samples: int = 64):
+        # Low-precision rgb / normals reductions should agree with full precision, for both batched and packed samples
+        from nr3d_lib.graphics.nerf import ray_alpha_to_vw
+        from nr3d_lib.models.fields.neus.renderer_mixin import _render_batched, _render_packed
+        if not torch.cuda.is_bf16_supported():
+            return
+        alpha = torch.rand([num_rays, num_samples], device=device) * 0.1
+        vw = ray_alpha_to_vw(alpha)
+        t = torch.linspace(0.1, 3.0, num_samples, device=device).expand(num_rays, num_samples).contiguous()
+        rgb = torch.rand([num_rays, num_samples, 3], device=device)
+        nablas = nn.functional.normalize(torch.randn([num_rays, num_samples, 3], device=device), dim=-1)
+        
+        out_fp32 = _render_batched(vw, t, rgb, nablas)
+        out_bf16 = _render_batched(vw, t, rgb, nablas, render_dtype=torch.bfloat16)
+        print(torch.allclose(out_bf16[..., :2], out_fp32[..., :2], atol=1e-6), torch.allclose(out_bf16, out_fp32, atol=1e-2))
+        
+        pack_infos = torch.stack([torch.arange(num_rays, device=device) * num_samples, torch.full([num_rays], num_samples, device=device)], -1).long()
+        out_fp32 = _render_packed(vw.flatten(), t.flatten(), pack_infos, rgb.flatten(0, 1), nablas.flatten(0, 1))
+        out_bf16 = _render_packed(vw.flatten(), t.flatten(), pack_infos, rgb.flatten(0, 1), nablas.flatten(0, 1), render_dtype=torch.bfloat16)
+        print(torch.allclose(out_bf16[..., :2], out_fp32[..., :2], atol=1e-6), torch.allclose(out_bf16, out_fp32, atol=1e-2))
+    
+    unit_test()
+    test_render_dtype()
+    test_ray_query_backward(compression=True)
+    test_ray_query_backward(compression=False)
+    test_near_sdf()
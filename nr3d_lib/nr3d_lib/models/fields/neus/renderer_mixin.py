@@ -62,6 +62,7 @@ from torch.utils.benchmark import Timer
 from nr3d_lib.fmt import log
 from nr3d_lib.logger import Logger
 from nr3d_lib.profile import profile
+from nr3d_lib.utils import torch_compile
 
 from nr3d_lib.models.model_base import ModelMixin
 from nr3d_lib.models.utils import batchify_query
@@ -69,10 +70,117 @@ from nr3d_lib.models.annealers import get_annealer
 from nr3d_lib.models.spatial import AABBSpace
 from nr3d_lib.models.accelerations import get_accel, accel_types_single_t
 
-from nr3d_lib.graphics.pack_ops import packed_div, packed_sum
+from nr3d_lib.graphics.pack_ops import packed_sum
 from nr3d_lib.graphics.nerf import packed_alpha_to_vw, ray_alpha_to_vw
 from nr3d_lib.graphics.neus import *
 
+@torch.jit.script
+def _norm_clamped(x: torch.Tensor) -> torch.Tensor:
+    # NOTE: Out-of-place clamp, so that the queried volume_buffer['nablas'] is left untouched
+    return F.normalize(x.clamp(-1.0, 1.0), dim=-1)
+
+def _render_payload(t: torch.Tensor, rgb: torch.Tensor = None, nablas: torch.Tensor = None) -> torch.Tensor:
+    # [..., 1+1(+3)(+3)]: [1, t, (rgb), (nablas)]
+    payload = [torch.ones_like(t).unsqueeze(-1), t.unsqueeze(-1)]
+    if rgb is not None:
+        payload.append(rgb)
+    if nablas is not None:
+        payload.append(nablas)
+    return torch.cat(payload, dim=-1)
+
+# NOTE: Not compiled on its own; traced as part of the compiled `_finalize_batched`
+def _render_batched(
+    vw: torch.Tensor, t: torch.Tensor, rgb: torch.Tensor = None, nablas: torch.Tensor = None, 
+    render_dtype: torch.dtype = None) -> torch.Tensor:
+    """ Weighted reduction of batched samples
+    
+    Args:
+        vw (torch.Tensor): [num_rays_hit, num_samples_per_ray] visibility weights
+        t (torch.Tensor): [num_rays_hit, num_samples_per_ray] depths
+        rgb (torch.Tensor, optional): [num_rays_hit, num_samples_per_ray, 3]
+        nablas (torch.Tensor, optional): [num_rays_hit, num_samples_per_ray, 3]
+        render_dtype (torch.dtype, optional): If given, rgb & nablas are reduced in this (lower) precision, \
+            while mask & depth stay in the precision of `vw`. Defaults to None.
+
+    Returns:
+        torch.Tensor: [num_rays_hit, 1+1(+3)(+3)] reduced [vw_sum, vw*t, (vw*rgb), (vw*nablas)]
+    """
+    # NOTE: Each channel group is reduced straight from the queried tensors (batched gemv for rgb / nablas); 
+    #       no [num_rays_hit, num_samples_per_ray, C] payload or weighted temporary is materialized.
+    out = [vw.sum(dim=-1, keepdim=True), torch.einsum('rs,rs->r', vw, t).unsqueeze(-1)]
+    vw_app = vw if render_dtype is None else vw.to(render_dtype)
+    for v in (rgb, nablas):
+        if v is not None:
+            v = v if render_dtype is None else v.to(render_dtype)
+            out.append(torch.einsum('rs,rsc->rc', vw_app, v).to(vw.dtype))
+    return torch.cat(out, dim=-1)
+
+def _render_packed(
+    vw: torch.Tensor, t: torch.Tensor, pack_infos: torch.LongTensor, rgb: torch.Tensor = None, nablas: torch.Tensor = None, 
+    render_dtype: torch.dtype = None) -> torch.Tensor:
+    """ Weighted reduction of packed samples in one pass
+    NOTE: Left eager: `packed_sum` is a custom CUDA op and would break any compiled graph right in the middle.
+
+    Args:
+        vw (torch.Tensor): [num_packed_samples] visibility weights
+        t (torch.Tensor): [num_packed_samples] depths
+        pack_infos (torch.LongTensor): [num_rays_hit, 2] pack infos
+        rgb (torch.Tensor, optional): [num_packed_samples, 3]
+        nablas (torch.Tensor, optional): [num_packed_samples, 3]
+        render_dtype (torch.dtype, optional): If given, rgb & nablas are reduced in this (lower) precision, \
+            while mask & depth stay in the precision of `vw`. Defaults to None.
+
+    Returns:
+        torch.Tensor: [num_rays_hit, 1+1(+3)(+3)] reduced [vw_sum, vw*t, (vw*rgb), (vw*nablas)]
+    """
+    # NOTE: Packed buffers are already flat & contiguous; no extra `.view()`
+    if render_dtype is None or (rgb is None and nablas is None):
+        return packed_sum(vw.unsqueeze(-1) * _render_payload(t, rgb, nablas), pack_infos)
+    out_geo = packed_sum(vw.unsqueeze(-1) * _render_payload(t), pack_infos)
+    app = torch.cat([v for v in (rgb, nablas) if v is not None], dim=-1).to(render_dtype)
+    out_app = packed_sum(vw.to(render_dtype).unsqueeze(-1) * app, pack_infos)
+    return torch.cat([out_geo, out_app.to(out_geo.dtype)], dim=-1)
+
+def _scatter_rendered(
+    rendered: Dict[str, torch.Tensor], rays_inds_hit: torch.Tensor, out: torch.Tensor, 
+    with_rgb: bool, with_normal: bool, depth_use_normalized_vw: bool):
+    # [num_rays_hit]
+    rendered['mask_volume'][rays_inds_hit] = vw_sum = out[..., 0]
+    if depth_use_normalized_vw:
+        # NOTE: sum(vw/(vw_sum+eps)*t) == sum(vw*t)/(vw_sum+eps); divide on the reduced tensor instead of per-sample
+        rendered['depth_volume'][rays_inds_hit] = out[..., 1] / (vw_sum+1e-10)
+    else:
+        rendered['depth_volume'][rays_inds_hit] = out[..., 1]
+    if with_rgb:
+        rendered['rgb_volume'][rays_inds_hit] = out[..., 2:5]
+    if with_normal:
+        rendered['normals_volume'][rays_inds_hit] = out[..., -3:]
+
+@torch_compile(dynamic=True)
+def _finalize_batched(
+    opacity_alpha: torch.Tensor, t: torch.Tensor, rgb: torch.Tensor, nablas: torch.Tensor, 
+    render_dtype: torch.dtype = None) -> Tuple[torch.Tensor, torch.Tensor]:
+    """ Volume render batched samples; returns the visibility weights and the reduced [num_rays_hit, 1+1(+3)(+3)] outputs
+    NOTE: Pure function; the in-place scatter into the output views is left to the (eager) caller.
+    """
+    vw = ray_alpha_to_vw(opacity_alpha)
+    return vw, _render_batched(vw, t, rgb, nablas, render_dtype=render_dtype)
+
+def _finalize_packed(
+    opacity_alpha: torch.Tensor, t: torch.Tensor, pack_infos: torch.LongTensor, rgb: torch.Tensor, nablas: torch.Tensor, 
+    render_dtype: torch.dtype = None) -> Tuple[torch.Tensor, torch.Tensor]:
+    """ Volume render packed samples; returns the visibility weights and the reduced [num_rays_hit, 1+1(+3)(+3)] outputs """
+    # NOTE: Not compiled: the packed CUDA ops are graph breaks
+    vw = packed_alpha_to_vw(opacity_alpha, pack_infos)
+    return vw, _render_packed(vw, t, pack_infos, rgb, nablas, render_dtype=render_dtype)
+
+def _neus_ray_query_sphere_trace(model, ray_tested: Dict[str, torch.Tensor], *, forward_inv_s=None, **kwargs):
+    # NOTE: Sphere tracing does not use `forward_inv_s`
+    return neus_ray_query_sphere_trace(model, ray_tested, **kwargs)
+
+def _neus_ray_query_not_implemented(model, ray_tested: Dict[str, torch.Tensor], **kwargs):
+    raise NotImplementedError
+
 class NeusRendererMixin(ModelMixin):
     """
     NeuS Renderer Mixin class
@@ -94,6 +202,11 @@ class NeusRendererMixin(ModelMixin):
     fwd_sdf_use_h_appear: bool = False
     fwd_sdf_use_view_dirs: bool = False
     
+    # NOTE: Precision of the rgb / normals render reductions (mask & depth always stay in float32). 
+    #       Set to None for full precision, or torch.float16 on GPUs without fast bfloat16.
+    #       The bfloat16 default falls back to None in `populate` if the device does not support it.
+    _render_dtype: torch.dtype = torch.bfloat16
+    
     def __init__(
         self, *, 
         # Renderer mixin kwargs
@@ -127,6 +240,25 @@ class NeusRendererMixin(ModelMixin):
         self.accel: accel_types_single_t = None if self.accel_cfg is None \
             else get_accel(space=self.space, device=self.device, **self.accel_cfg)
         self.upsample_s_divisor = 1.0
+        # Side stream for occupancy sample collection, so that it overlaps with the main forward / backward
+        self._accel_stream = torch.cuda.Stream(device=self.device) \
+            if (self.accel is not None) and (torch.device(self.device).type == 'cuda') else None
+        
+        if (self._render_dtype == torch.bfloat16) and not \
+            ((torch.device(self.device).type == 'cuda') and torch.cuda.is_bf16_supported()):
+            self._render_dtype = None
+        
+        # Ray query dispatch table: query_mode -> query function
+        self._query_dispatch = {
+            'march_occ_multi_upsample': neus_ray_query_march_occ_multi_upsample, 
+            'march_occ_multi_upsample_compressed': neus_ray_query_march_occ_multi_upsample_compressed, 
+            'march_occ_multi_upsample_compressed_strategy': _neus_ray_query_not_implemented, 
+            'coarse_multi_upsample': neus_ray_query_coarse_multi_upsample, 
+            'march_occ': _neus_ray_query_not_implemented, 
+            'sphere_trace': _neus_ray_query_sphere_trace, 
+        }
+        # Query modes that can batch `extra_query_x` (e.g. near points) into their own SDF query
+        self._query_modes_with_extra_x = {'coarse_multi_upsample'}
         
         # Sample annealing
         self.sample_ctrl = get_annealer(**self.sample_anneal_cfg) if self.sample_anneal_cfg is not None else None
@@ -135,32 +267,58 @@ class NeusRendererMixin(ModelMixin):
     # def space(self) -> AABBSpace:
     #     return super().space
 
-    def sample_pts_uniform(self, num_samples: int):
-        # NOTE: Returns normalized `x`
-        x = self.space.sample_pts_uniform(num_samples)
-        ret = self.forward_sdf_nablas(x, skip_accel=True) # Do not upsate_samples here (usally there are too less samples here.)
+    def _query_sampled_pts(self, x: torch.Tensor, with_sdf=True, with_nablas=True, with_grad=True):
+        if not (with_sdf or with_nablas):
+            return {'net_x': x} # NOTE: in network's uniformed space; not in world space.
+        # NOTE: `no_grad` rather than `inference_mode`: the outputs may still be mixed into autograd graphs by callers
+        with torch.set_grad_enabled(with_grad and torch.is_grad_enabled()):
+            # Do not upsate_samples here (usally there are too less samples here.)
+            if with_nablas:
+                ret = self.forward_sdf_nablas(x, skip_accel=True)
+            else:
+                ret = self.forward_sdf(x, skip_accel=True)
         ret = {k: v.to(x.dtype) for k, v in ret.items()}
         ret['net_x'] = x # NOTE: in network's uniformed space; not in world space.
         return ret
 
-    def sample_pts_in_occupied(self, num_samples: int):
+    def sample_pts_uniform(self, num_samples: int, with_sdf=True, with_nablas=True, with_grad=True):
+        # NOTE: Returns normalized `x`
+        x = self.space.sample_pts_uniform(num_samples)
+        return self._query_sampled_pts(x, with_sdf=with_sdf, with_nablas=with_nablas, with_grad=with_grad)
+
+    def sample_pts_in_occupied(self, num_samples: int, with_sdf=True, with_nablas=True, with_grad=True):
         assert self.accel is not None, "Requires self.accel not to be None"
         x = self.accel.sample_pts_in_occupied(num_samples) # [-1,1]
-        ret = self.forward_sdf_nablas(x, skip_accel=True) # Do not upsate_samples here (usally there are too less samples here.)
-        ret = {k: v.to(x.dtype) for k, v in ret.items()}
-        ret['net_x'] = x # NOTE: in network's uniformed space; not in world space.
-        return ret
+        return self._query_sampled_pts(x, with_sdf=with_sdf, with_nablas=with_nablas, with_grad=with_grad)
+
+    def _accel_collect_samples(self, x: torch.Tensor, val: torch.Tensor):
+        stream = self._accel_stream
+        if stream is None:
+            self.accel.collect_samples(x, val=val)
+            return
+        # NOTE: Fire-and-forget on the side stream once `x` and `val` are ready; 
+        #       the main stream waits on it in `_accel_sync()` before the occ grid is updated / read.
+        stream.wait_stream(torch.cuda.current_stream(x.device))
+        with torch.cuda.stream(stream):
+            self.accel.collect_samples(x, val=val)
+        # Keep the caching allocator from reusing their memory until the side stream is done
+        x.record_stream(stream)
+        val.record_stream(stream)
+    
+    def _accel_sync(self):
+        if self._accel_stream is not None:
+            torch.cuda.current_stream(self._accel_stream.device).wait_stream(self._accel_stream)
 
     def forward_sdf(self, x: torch.Tensor, skip_accel=False, **kwargs):
         ret = super().forward_sdf(x, **kwargs)
         if self.training and (not skip_accel) and (self.accel is not None):
-            self.accel.collect_samples(x, val=ret['sdf'].data)
+            self._accel_collect_samples(x, ret['sdf'].data)
         return ret
     
     def forward_sdf_nablas(self, x: torch.Tensor, skip_accel=False, **kwargs):
         ret = super().forward_sdf_nablas(x, **kwargs)
         if self.training and (not skip_accel) and (self.accel is not None):
-            self.accel.collect_samples(x, val=ret['sdf'].data)
+            self._accel_collect_samples(x, ret['sdf'].data)
         return ret
 
     @torch.no_grad()
@@ -179,6 +337,7 @@ class NeusRendererMixin(ModelMixin):
         if (not skip_accel) and (self.accel is not None):
             self.upsample_s_divisor = 2 ** self.accel.training_granularity
             if self.training:
+                self._accel_sync()
                 self.accel.step(cur_it, self.query_sdf, logger)
                 # if cur_it == 0:
                 #     self.accel.init(self.query_sdf, logger)
@@ -188,6 +347,8 @@ class NeusRendererMixin(ModelMixin):
     def training_after_per_step(self, cur_it: int, logger: Logger = None, skip_accel=False):
         super().training_after_per_step(cur_it, logger=logger)
         if (not skip_accel) and (self.accel is not None):
+            # NOTE: Collected samples must have landed before shrinking / checkpointing
+            self._accel_sync()
             #------------ Shrink according to actual occupied space.
             if cur_it in self.shrink_milestones:
                 self.shrink()
@@ -318,6 +479,10 @@ class NeusRendererMixin(ModelMixin):
         query_mode, with_rgb, with_normal = config.query_mode, config.with_rgb, config.with_normal
         forward_inv_s = config.get('forward_inv_s', self.forward_inv_s())
         # forward_inv_s = upsample_inv_s / 4.
+        # NOTE: Bind frequently accessed attributes to locals once per call
+        training, accel = self.training, self.accel
+        use_ts, use_fidx = self.use_ts, self.use_fidx
+        upsample_s_divisor = self.upsample_s_divisor
         
         #----------------
         # Prepare outputs & compute outputs that are needed even when (num_rays==0)
@@ -327,24 +492,31 @@ class NeusRendererMixin(ModelMixin):
             raw_ret['volume_buffer'] = dict(type='empty', rays_inds_hit=[])
         if return_details:
             details = raw_ret['details'] = {}
-            if (self.accel is not None) and hasattr(self.accel, 'debug_stats'):
-                details['accel'] = self.accel.debug_stats()
-            details['inv_s'] = forward_inv_s.item() if isinstance(forward_inv_s, torch.Tensor) else forward_inv_s
-            details['s'] = 1./ details['inv_s']
+            if (accel is not None) and hasattr(accel, 'debug_stats'):
+                details['accel'] = accel.debug_stats()
+            # NOTE: Keep on-device 0-d tensors; `.item()` is deferred to the consumer (e.g. logger) to avoid a host sync per call
+            details['inv_s'] = inv_s = forward_inv_s.detach() if isinstance(forward_inv_s, torch.Tensor) else forward_inv_s
+            details['s'] = 1./ inv_s
             if hasattr(self, 'radiance_net') and hasattr(self.radiance_net, 'blocks') \
                 and hasattr(self.radiance_net.blocks, 'lipshitz_bound_full'):
-                details['radiance.lipshitz_bound'] = self.radiance_net.blocks.lipshitz_bound_full().item()
+                details['radiance.lipshitz_bound'] = self.radiance_net.blocks.lipshitz_bound_full().detach()
                 
         if render_per_obj_individual:
             prefix_rays = ray_input['rays_o'].shape[:-1]
-            raw_ret['rendered'] = rendered = dict(
-                depth_volume = torch.zeros([*prefix_rays], dtype=dtype, device=device),
-                mask_volume = torch.zeros([*prefix_rays], dtype=dtype, device=device),
-            )
-            if with_rgb:
-                rendered['rgb_volume'] = torch.zeros([*prefix_rays, 3], dtype=dtype, device=device)
-            if with_normal:
-                rendered['normals_volume'] = torch.zeros([*prefix_rays, 3], dtype=dtype, device=device)
+            # NOTE: One allocation & memset for all outputs, carved into contiguous per-channel (SoA) views.
+            #       [depth | mask | (rgb) | (normals)], each chunk of size `numel * dim`
+            out_dims = [('depth_volume', 1), ('mask_volume', 1)]
+            if with_rgb: out_dims.append(('rgb_volume', 3))
+            if with_normal: out_dims.append(('normals_volume', 3))
+            numel = prefix_rays.numel()
+            out_buf = torch.zeros([numel * sum(d for _, d in out_dims)], dtype=dtype, device=device)
+            raw_ret['rendered'] = rendered = {}
+            offset = 0
+            for k, d in out_dims:
+                # NOTE: `narrow` (single-output view) rather than `split`: autograd forbids in-place writes 
+                #       of grad-requiring values into multi-output views, which the scatters below do in training.
+                rendered[k] = out_buf.narrow(0, offset, numel * d).view([*prefix_rays, d] if d > 1 else [*prefix_rays])
+                offset += numel * d
 
         if ray_tested['num_rays'] == 0:
             return raw_ret
@@ -352,32 +524,18 @@ class NeusRendererMixin(ModelMixin):
         #----------------
         # Ray query
         #----------------
-        if query_mode == 'march_occ_multi_upsample':
-            volume_buffer, query_details = neus_ray_query_march_occ_multi_upsample(
-                self, ray_tested, with_rgb=with_rgb, with_normal=with_normal, 
-                upsample_s_divisor=self.upsample_s_divisor, 
-                perturb=config.perturb, forward_inv_s=forward_inv_s, **config.query_param)
-        elif query_mode == 'march_occ_multi_upsample_compressed':
-            volume_buffer, query_details = neus_ray_query_march_occ_multi_upsample_compressed(
-                self, ray_tested, with_rgb=with_rgb, with_normal=with_normal, 
-                upsample_s_divisor=self.upsample_s_divisor, 
-                perturb=config.perturb, forward_inv_s=forward_inv_s, **config.query_param)
-        elif query_mode == 'march_occ_multi_upsample_compressed_strategy':
-            raise NotImplementedError
-        elif query_mode == 'coarse_multi_upsample':
-            volume_buffer, query_details = neus_ray_query_coarse_multi_upsample(
-                self, ray_tested, with_rgb=with_rgb, with_normal=with_normal, 
-                upsample_s_divisor=self.upsample_s_divisor, 
-                perturb=config.perturb, forward_inv_s=forward_inv_s, **config.query_param)
-        elif query_mode == 'march_occ':
-            raise NotImplementedError
-        elif query_mode == "sphere_trace":
-            volume_buffer, query_details = neus_ray_query_sphere_trace(
-                self, ray_tested, with_rgb=with_rgb, with_normal=with_normal,
-                upsample_s_divisor=self.upsample_s_divisor, 
-                perturb=config.perturb, **config.query_param)
-        else:
+        perturb, query_param = config.perturb, config.query_param
+        query_fn = self._query_dispatch.get(query_mode, None)
+        if query_fn is None:
             raise RuntimeError(f"Invalid query_mode={query_mode}")
+        extra_query_kwargs = {}
+        if return_details and config.get('with_near_sdf', False) and (query_mode in self._query_modes_with_extra_x):
+            # NOTE: Query near points' SDF in the same network launch as the interval boundaries
+            extra_query_kwargs['extra_query_x'] = torch.addcmul(ray_tested['rays_o'], ray_tested['rays_d'], ray_tested['near'].unsqueeze(-1))
+        volume_buffer, query_details = query_fn(
+            self, ray_tested, with_rgb=with_rgb, with_normal=with_normal, 
+            upsample_s_divisor=upsample_s_divisor, 
+            perturb=perturb, forward_inv_s=forward_inv_s, **query_param, **extra_query_kwargs)
 
         #----------------
         # Calc outputs
@@ -387,10 +545,12 @@ class NeusRendererMixin(ModelMixin):
         
         if return_details:
             details.update(query_details)
-            if config.get('with_near_sdf', False):
+            if 'extra_query_sdf' in details:
+                details['near_sdf'] = details.pop('extra_query_sdf')
+            elif config.get('with_near_sdf', False):
                 fwd_kwargs = dict(x=torch.addcmul(ray_tested['rays_o'], ray_tested['rays_d'], ray_tested['near'].unsqueeze(-1)))
-                if self.use_ts: fwd_kwargs['ts'] = ray_tested['rays_ts']
-                if self.use_fidx: fwd_kwargs['fidx'] = ray_tested['rays_fidx']
+                if use_ts: fwd_kwargs['ts'] = ray_tested['rays_ts']
+                if use_fidx: fwd_kwargs['fidx'] = ray_tested['rays_fidx']
                 details['near_sdf'] = self.forward_sdf(**fwd_kwargs)['sdf']
         
         if render_per_obj_individual:
@@ -399,42 +559,23 @@ class NeusRendererMixin(ModelMixin):
                     rays_inds_hit = volume_buffer['rays_inds_hit']
                     depth_use_normalized_vw = config.get('depth_use_normalized_vw', True)
                     
-                    if buffer_type == 'batched':
-                        volume_buffer['vw'] = vw = ray_alpha_to_vw(volume_buffer['opacity_alpha'])
-                        rendered['mask_volume'][rays_inds_hit] = vw_sum = vw.sum(dim=-1)
-                        if depth_use_normalized_vw:
-                            # TODO: This can also be differed by training / non-training
-                            vw_normalized = vw / (vw_sum.unsqueeze(-1)+1e-10)
-                            rendered['depth_volume'][rays_inds_hit] = (vw_normalized * volume_buffer['t']).sum(dim=-1)
+                    rgb = volume_buffer['rgb'] if with_rgb else None
+                    nablas = None
+                    if with_normal:
+                        if training:
+                            nablas = volume_buffer['nablas']
                         else:
-                            rendered['depth_volume'][rays_inds_hit] = (vw * volume_buffer['t']).sum(dim=-1)
-                            
-                        if with_rgb:
-                            rendered['rgb_volume'][rays_inds_hit] = (vw.unsqueeze(-1) * volume_buffer['rgb']).sum(dim=-2)
-                        if with_normal:
-                            # rendered['normals_volume'][rays_inds_hit] = (vw.unsqueeze(-1) * volume_buffer['nablas']).sum(dim=-2)
-                            if self.training:
-                                rendered['normals_volume'][rays_inds_hit] = (vw.unsqueeze(-1) * volume_buffer['nablas']).sum(dim=-2)
-                            else:
-                                rendered['normals_volume'][rays_inds_hit] = (vw.unsqueeze(-1) * F.normalize(volume_buffer['nablas'].clamp_(-1,1), dim=-1)).sum(dim=-2)
+                            nablas = _norm_clamped(volume_buffer['nablas'])
+                    
+                    # NOTE: All per-sample channels are weighted and reduced in a single pass: [1, t, (rgb), (nablas)]
+                    if buffer_type == 'batched':
+                        volume_buffer['vw'], out = _finalize_batched(
+                            volume_buffer['opacity_alpha'], volume_buffer['t'], rgb, nablas, render_dtype=self._render_dtype)
                     elif buffer_type == 'packed':
-                        pack_infos_hit = volume_buffer['pack_infos_hit']
-                        # [num_sampels]
-                        volume_buffer['vw'] = vw = packed_alpha_to_vw(volume_buffer['opacity_alpha'], pack_infos_hit)
-                        # [num_rays_hit]
-                        rendered['mask_volume'][rays_inds_hit] = vw_sum = packed_sum(vw.view(-1), pack_infos_hit)
-                        # [num_samples]
-                        if depth_use_normalized_vw:
-                            vw_normalized = packed_div(vw, vw_sum + 1e-10, pack_infos_hit)
-                            rendered['depth_volume'][rays_inds_hit] = packed_sum(vw_normalized * volume_buffer['t'].view(-1), pack_infos_hit)
-                        else:
-                            rendered['depth_volume'][rays_inds_hit] = packed_sum(vw.view(-1) * volume_buffer['t'].view(-1), pack_infos_hit)
-                        if with_rgb:
-                            rendered['rgb_volume'][rays_inds_hit] = packed_sum(vw.view(-1,1) * volume_buffer['rgb'].view(-1,3), pack_infos_hit)
-                        if with_normal:
-                            # rendered['normals_volume'][rays_inds_hit] = packed_sum(vw.view(-1,1) * volume_buffer['nablas'].view(-1,3), pack_infos_hit)
-                            if self.training:
-                                rendered['normals_volume'][rays_inds_hit] = packed_sum(vw.view(-1,1) * volume_buffer['nablas'].view(-1,3), pack_infos_hit)
-                            else:
-                                rendered['normals_volume'][rays_inds_hit] = packed_sum(vw.view(-1,1) * F.normalize(volume_buffer['nablas'].clamp_(-1,1), dim=-1).view(-1,3), pack_infos_hit)
+                        volume_buffer['vw'], out = _finalize_packed(
+                            volume_buffer['opacity_alpha'], volume_buffer['t'], volume_buffer['pack_infos_hit'], rgb, nablas, render_dtype=self._render_dtype)
+                    else:
+                        raise RuntimeError(f"Invalid buffer_type={buffer_type}")
+                    # NOTE: Eager in-place scatter into the (narrowed) output views, outside the compiled region
+                    _scatter_rendered(rendered, rays_inds_hit, out, with_rgb, with_normal, depth_use_normalized_vw)
         return raw_ret
@@ -18,7 +18,7 @@ from nr3d_lib.models.model_base import ModelMixin
 from nr3d_lib.models.spatial import BatchedBlockSpace
 from nr3d_lib.models.accelerations import get_accel, accel_types_batched_t
 
-from nr3d_lib.graphics.pack_ops import packed_div, packed_sum
+from nr3d_lib.graphics.pack_ops import packed_sum, packed_weighted_mean
 from nr3d_lib.graphics.nerf import packed_alpha_to_vw, ray_alpha_to_vw
 from nr3d_lib.graphics.neus import *
 
@@ -280,20 +280,23 @@ class NeuSRendererMixinBatched(ModelMixin):
             raw_ret['volume_buffer'] = dict(type='empty')
         if return_details:
             details = raw_ret['details'] = {}
-            details['inv_s'] = forward_inv_s.item() if isinstance(forward_inv_s, torch.Tensor) else forward_inv_s
-            details['s'] = 1./ details['inv_s']
+            # NOTE: Keep on-device 0-d tensors; `.item()` is deferred to the consumer (e.g. logger) to avoid a host sync per call
+            details['inv_s'] = inv_s = forward_inv_s.detach() if isinstance(forward_inv_s, torch.Tensor) else forward_inv_s
+            details['s'] = 1./ inv_s
             if (self.accel is not None) and hasattr(self.accel, 'debug_stats'):
                 details['accel'] = self.accel.debug_stats()
         if render_per_obj_individual:
             prefix_rays = batched_ray_input['rays_o'].shape[:-1]
             raw_ret['rendered'] = rendered = dict(
-                depth_volume = torch.zeros([*prefix_rays], dtype=dtype, device=device),
-                mask_volume = torch.zeros([*prefix_rays], dtype=dtype, device=device),
+                depth_volume = torch.empty([*prefix_rays], dtype=dtype, device=device),
+                mask_volume = torch.empty([*prefix_rays], dtype=dtype, device=device),
             )
             if with_rgb:
-                rendered['rgb_volume'] = torch.zeros([*prefix_rays, 3], dtype=dtype, device=device)
+                rendered['rgb_volume'] = torch.empty([*prefix_rays, 3], dtype=dtype, device=device)
             if with_normal:
-                rendered['normals_volume'] = torch.zeros([*prefix_rays, 3], dtype=dtype, device=device)
+                rendered['normals_volume'] = torch.empty([*prefix_rays, 3], dtype=dtype, device=device)
+            # NOTE: Zero all outputs with one multi-tensor kernel instead of one memset per output
+            torch._foreach_zero_(list(rendered.values()))
         
         if batched_ray_tested['num_rays'] == 0:
             return raw_ret
@@ -370,8 +373,7 @@ class NeuSRendererMixinBatched(ModelMixin):
                     rendered['mask_volume'][inds] = vw_sum = packed_sum(vw.view(-1), pack_infos_hit)
                     # [num_samples]
                     if depth_use_normalized_vw:
-                        vw_normalized = packed_div(vw, vw_sum + 1e-10, pack_infos_hit)
-                        rendered['depth_volume'][inds] = packed_sum(vw_normalized * volume_buffer['t'].view(-1), pack_infos_hit)
+                        rendered['depth_volume'][inds] = packed_weighted_mean(volume_buffer['t'].view(-1), vw.view(-1), pack_infos_hit, eps=1e-10, weights_sum=vw_sum)
                     else:
                         rendered['depth_volume'][inds] = packed_sum(vw.view(-1) * volume_buffer['t'].view(-1), pack_infos_hit)
                     if with_rgb:
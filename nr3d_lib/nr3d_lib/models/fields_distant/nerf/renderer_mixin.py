@@ -20,7 +20,7 @@ from nr3d_lib.models.model_base import ModelMixin
 from nr3d_lib.models.spatial import AABBSpace
 from nr3d_lib.models.accelerations import get_accel, accel_types_single_t
 
-from nr3d_lib.graphics.pack_ops import get_pack_infos_from_n, packed_div, packed_sum
+from nr3d_lib.graphics.pack_ops import get_pack_infos_from_n, packed_sum, packed_weighted_mean
 from nr3d_lib.graphics.nerf import packed_alpha_to_vw, ray_alpha_to_vw, tau_to_alpha, packed_volume_render_compression
 
 
@@ -530,8 +530,7 @@ class NeRFRendererMixinDistant(ModelMixin):
                     rendered['mask_volume'][rays_inds_hit] = vw_sum = packed_sum(vw.view(-1), pack_infos_hit)
                     # [num_samples]
                     if depth_use_normalized_vw:
-                        vw_normalized = packed_div(vw, vw_sum + 1e-10, pack_infos_hit)
-                        rendered['depth_volume'][rays_inds_hit] = packed_sum(vw_normalized * volume_buffer['t'].view(-1), pack_infos_hit)
+                        rendered['depth_volume'][rays_inds_hit] = packed_weighted_mean(volume_buffer['t'].view(-1), vw.view(-1), pack_infos_hit, eps=1e-10, weights_sum=vw_sum)
                     else:
                         rendered['depth_volume'][rays_inds_hit] = packed_sum(vw.view(-1) * volume_buffer['t'].view(-1), pack_infos_hit)
                     if with_rgb:
@@ -751,34 +751,36 @@ class EmerNeRFModel(EmerNeRF):
                 details['accel'] = self.accel.debug_stats()
             if hasattr(self, 'radiance_net') and hasattr(self.radiance_net, 'blocks') \
                 and hasattr(self.radiance_net.blocks, 'lipshitz_bound_full'):
-                details['radiance.lipshitz_bound'] = self.radiance_net.blocks.lipshitz_bound_full().item()
+                details['radiance.lipshitz_bound'] = self.radiance_net.blocks.lipshitz_bound_full().detach()
                 
         if render_per_obj_individual:
             prefix_rays = ray_input['rays_o'].shape[:-1]
             raw_ret['rendered'] = rendered = dict(
-                depth_volume = torch.zeros([*prefix_rays], dtype=dtype, device=device),
-                mask_volume = torch.zeros([*prefix_rays], dtype=dtype, device=device),
+                depth_volume = torch.empty([*prefix_rays], dtype=dtype, device=device),
+                mask_volume = torch.empty([*prefix_rays], dtype=dtype, device=device),
             )
             if with_rgb:
-                rendered['rgb_volume'] = torch.zeros([*prefix_rays, 3], dtype=dtype, device=device)
+                rendered['rgb_volume'] = torch.empty([*prefix_rays, 3], dtype=dtype, device=device)
             if with_normal:
-                rendered['normals_volume'] = torch.zeros([*prefix_rays, 3], dtype=dtype, device=device)
+                rendered['normals_volume'] = torch.empty([*prefix_rays, 3], dtype=dtype, device=device)
             if with_flow:
-                rendered['flow_fwd'] = torch.zeros([*prefix_rays, 3], dtype=dtype, device=device)
-                rendered['flow_bwd'] = torch.zeros([*prefix_rays, 3], dtype=dtype, device=device)
+                rendered['flow_fwd'] = torch.empty([*prefix_rays, 3], dtype=dtype, device=device)
+                rendered['flow_bwd'] = torch.empty([*prefix_rays, 3], dtype=dtype, device=device)
                 # rendered['flow_bwd_pred_fwd'] = torch.zeros([*prefix_rays, 3], dtype=dtype, device=device)
                 # rendered['flow_fwd_pred_bwd'] = torch.zeros([*prefix_rays, 3], dtype=dtype, device=device)
             if with_static_dynamic:
-                rendered['mask_static'] = torch.zeros([*prefix_rays], dtype=dtype, device=device)
-                rendered['mask_dynamic'] = torch.zeros([*prefix_rays], dtype=dtype, device=device)
-                rendered['depth_static'] = torch.zeros([*prefix_rays], dtype=dtype, device=device)
-                rendered['depth_dynamic'] = torch.zeros([*prefix_rays], dtype=dtype, device=device)
+                rendered['mask_static'] = torch.empty([*prefix_rays], dtype=dtype, device=device)
+                rendered['mask_dynamic'] = torch.empty([*prefix_rays], dtype=dtype, device=device)
+                rendered['depth_static'] = torch.empty([*prefix_rays], dtype=dtype, device=device)
+                rendered['depth_dynamic'] = torch.empty([*prefix_rays], dtype=dtype, device=device)
                 if with_rgb:
-                    rendered['rgb_static'] = torch.zeros([*prefix_rays, 3], dtype=dtype, device=device)
-                    rendered['rgb_dynamic'] = torch.zeros([*prefix_rays, 3], dtype=dtype, device=device)
+                    rendered['rgb_static'] = torch.empty([*prefix_rays, 3], dtype=dtype, device=device)
+                    rendered['rgb_dynamic'] = torch.empty([*prefix_rays, 3], dtype=dtype, device=device)
                 if with_normal:
-                    rendered['normals_static'] = torch.zeros([*prefix_rays, 3], dtype=dtype, device=device)
-                    rendered['normals_dynamic'] = torch.zeros([*prefix_rays, 3], dtype=dtype, device=device)
+                    rendered['normals_static'] = torch.empty([*prefix_rays, 3], dtype=dtype, device=device)
+                    rendered['normals_dynamic'] = torch.empty([*prefix_rays, 3], dtype=dtype, device=device)
+            # NOTE: Zero all outputs with one multi-tensor kernel instead of one memset per output
+            torch._foreach_zero_(list(rendered.values()))
 
         if ray_tested['num_rays'] == 0:
             return raw_ret
@@ -888,8 +890,7 @@ class EmerNeRFModel(EmerNeRF):
                         rendered['mask_volume'][rays_inds_hit] = vw_sum = packed_sum(vw.view(-1), pack_infos_hit)
                         # [num_samples]
                         if depth_use_normalized_vw:
-                            vw_normalized = packed_div(vw, vw_sum + 1e-10, pack_infos_hit)
-                            rendered['depth_volume'][rays_inds_hit] = packed_sum(vw_normalized * volume_buffer['t'].view(-1), pack_infos_hit)
+                            rendered['depth_volume'][rays_inds_hit] = packed_weighted_mean(volume_buffer['t'].view(-1), vw.view(-1), pack_infos_hit, eps=1e-10, weights_sum=vw_sum)
                         else:
                             rendered['depth_volume'][rays_inds_hit] = packed_sum(vw.view(-1) * volume_buffer['t'].view(-1), pack_infos_hit)
                         if with_rgb:
@@ -911,10 +912,8 @@ class EmerNeRFModel(EmerNeRF):
                             rendered['mask_static'][rays_inds_hit] = vw_sum_static = packed_sum(vw_static.view(-1), pack_infos_hit)
                             rendered['mask_dynamic'][rays_inds_hit] = vw_sum_dynamic = packed_sum(vw_dynamic.view(-1), pack_infos_hit)
                             if depth_use_normalized_vw:
-                                vw_normalized_static = packed_div(vw_static, vw_sum_static + 1e-10, pack_infos_hit)
-                                vw_normalized_dynamic = packed_div(vw_dynamic, vw_sum_dynamic + 1e-10, pack_infos_hit)
-                                rendered['depth_static'][rays_inds_hit] = packed_sum(vw_normalized_static * volume_buffer['t'].view(-1), pack_infos_hit)
-                                rendered['depth_dynamic'][rays_inds_hit] = packed_sum(vw_normalized_dynamic * volume_buffer['t'].view(-1), pack_infos_hit)
+                                rendered['depth_static'][rays_inds_hit] = packed_weighted_mean(volume_buffer['t'].view(-1), vw_static.view(-1), pack_infos_hit, eps=1e-10, weights_sum=vw_sum_static)
+                                rendered['depth_dynamic'][rays_inds_hit] = packed_weighted_mean(volume_buffer['t'].view(-1), vw_dynamic.view(-1), pack_infos_hit, eps=1e-10, weights_sum=vw_sum_dynamic)
                             else:
                                 rendered['depth_static'][rays_inds_hit] = packed_sum(vw_static.view(-1) * volume_buffer['t'].view(-1), pack_infos_hit)
                                 rendered['depth_dynamic'][rays_inds_hit] = packed_sum(vw_dynamic.view(-1) * volume_buffer['t'].view(-1), pack_infos_hit)
@@ -17,7 +17,7 @@ from nr3d_lib.models.annealers import get_annealer
 from nr3d_lib.models.spatial import AABBDynamicSpace
 from nr3d_lib.models.accelerations import get_accel, accel_types_dynamic_t
 
-from nr3d_lib.graphics.pack_ops import packed_div, packed_sum
+from nr3d_lib.graphics.pack_ops import packed_sum, packed_weighted_mean
 from nr3d_lib.graphics.nerf import *
 
 class NerfRendererMixinDynamic(ModelMixin):
@@ -241,18 +241,20 @@ class NerfRendererMixinDynamic(ModelMixin):
                 details['accel'] = self.accel.debug_stats()
             if hasattr(self, 'radiance_net') and hasattr(self.radiance_net, 'blocks') \
                 and hasattr(self.radiance_net.blocks, 'lipshitz_bound_full'):
-                details['radiance.lipshitz_bound'] = self.radiance_net.blocks.lipshitz_bound_full().item()
+                details['radiance.lipshitz_bound'] = self.radiance_net.blocks.lipshitz_bound_full().detach()
                 
         if render_per_obj_individual:
             prefix_rays = ray_input['rays_o'].shape[:-1]
             raw_ret['rendered'] = rendered = dict(
-                depth_volume = torch.zeros([*prefix_rays], dtype=dtype, device=device),
-                mask_volume = torch.zeros([*prefix_rays], dtype=dtype, device=device),
+                depth_volume = torch.empty([*prefix_rays], dtype=dtype, device=device),
+                mask_volume = torch.empty([*prefix_rays], dtype=dtype, device=device),
             )
             if with_rgb:
-                rendered['rgb_volume'] = torch.zeros([*prefix_rays, 3], dtype=dtype, device=device)
+                rendered['rgb_volume'] = torch.empty([*prefix_rays, 3], dtype=dtype, device=device)
             if with_normal:
-                rendered['normals_volume'] = torch.zeros([*prefix_rays, 3], dtype=dtype, device=device)
+                rendered['normals_volume'] = torch.empty([*prefix_rays, 3], dtype=dtype, device=device)
+            # NOTE: Zero all outputs with one multi-tensor kernel instead of one memset per output
+            torch._foreach_zero_(list(rendered.values()))
 
         if ray_tested['num_rays'] == 0:
             return raw_ret
@@ -311,8 +313,7 @@ class NerfRendererMixinDynamic(ModelMixin):
                         rendered['mask_volume'][rays_inds_hit] = vw_sum = packed_sum(vw.view(-1), pack_infos_hit)
                         # [num_samples]
                         if depth_use_normalized_vw:
-                            vw_normalized = packed_div(vw, vw_sum + 1e-10, pack_infos_hit)
-                            rendered['depth_volume'][rays_inds_hit] = packed_sum(vw_normalized * volume_buffer['t'].view(-1), pack_infos_hit)
+                            rendered['depth_volume'][rays_inds_hit] = packed_weighted_mean(volume_buffer['t'].view(-1), vw.view(-1), pack_infos_hit, eps=1e-10, weights_sum=vw_sum)
                         else:
                             rendered['depth_volume'][rays_inds_hit] = packed_sum(vw.view(-1) * volume_buffer['t'].view(-1), pack_infos_hit)
                         if with_rgb:
@@ -452,6 +452,26 @@ def torch_dtype(dtype: Union[torch.dtype, str]):
     else:
         raise RuntimeError(f"Invalid type of `dtype`: {type(dtype)}")
 
+def torch_compile(fn: Callable = None, **compile_kwargs):
+    """
+    `torch.compile` that degrades to identity on torch versions without it.
+    Can be used both as `@torch_compile` and `@torch_compile(**kwargs)`
+    NOTE: Compilation failures at first call (e.g. missing triton / C++ compiler, inductor lowering errors) 
+          also fall back to eager instead of raising.
+    """
+    def decorator(f: Callable):
+        if not hasattr(torch, 'compile'):
+            return f
+        try:
+            import torch._dynamo
+            torch._dynamo.config.suppress_errors = True
+            return torch.compile(f, **compile_kwargs)
+        except RuntimeError as e:
+            # NOTE: e.g. torch 2.0 raises on python 3.11+ / Windows when decorating
+            log.warning(f"torch.compile unavailable for {f.__name__}, using eager: {e}")
+            return f
+    return decorator if fn is None else decorator(fn)
+
 def check_to_torch(
     x: Union[np.ndarray, torch.Tensor, List, Tuple],
     ref: torch.Tensor=None, dtype: torch.dtype=None, device: torch.device=None) -> torch.Tensor:
@@ -808,6 +828,12 @@ def get_shape(t) -> Tuple[int]:
 def is_scalar(t: Union[torch.Tensor, np.ndarray]):
     return isinstance(t, Number) or (hasattr(t, 'shape') and prod(t.shape) == 1)
 
+def lazy_scalar(t: Union[Number, torch.Tensor, np.ndarray]) -> Number:
+    """ Resolve a (possibly on-device) scalar to a python number. 
+    Producers may keep 0-d tensors (no host sync); consumers call this when they actually need the value.
+    """
+    return t if isinstance(t, Number) else t.item()
+
 # ---------------------------------------------
 # ----------------     File     ---------------
 # ---------------------------------------------
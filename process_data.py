@@ -1,25 +1,42 @@
 import os
+import sys
+import errno
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+def move_entry(entry, output_dir):
+    target = os.path.join(output_dir, entry.name)
+    # Same guard as `shutil.move(src, output_dir)`: never overwrite or merge into an existing entry
+    if os.path.lexists(target):
+        raise shutil.Error(f"Destination path '{target}' already exists")
+    try:
+        # Single syscall when input and output share a filesystem
+        os.rename(entry.path, target)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Cross-device move falls back to copy + delete
+        shutil.move(entry.path, output_dir)
 
 def process(input_dir, output_dir):
     # List of steps as integers
     list_step = [16, 21, 22, 25, 31, 34, 35, 49, 53, 80, 84, 86, 89, 94, 96, 102, 111, 222, 323, 382, 402, 427, 438, 546, 581, 592, 620, 640, 700, 754, 795, 796]
+    # Scene names to keep, matched against the 3-digit directory entries
+    keep = frozenset(f"{n:03d}" for n in list_step)
 
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
 
-    for filename in os.listdir(input_dir):
+    with os.scandir(input_dir) as it:
         # Check if the filename is a number with 3 digits
-        if filename.isdigit() and len(filename) == 3:
-            file_num = int(filename)
-            if file_num not in list_step:
-                # Build full file path
-                file_path = os.path.join(input_dir, filename)
-                # Move file to output directory
-                shutil.move(file_path, output_dir)
-                print(f"Moved {filename} to {output_dir}")
+        to_move = [entry for entry in it if len(entry.name) == 3 and entry.name.isdigit() and entry.name not in keep]
+
+    # Renames are syscall-latency bound and release the GIL, so overlap them across threads
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as ex:
+        list(ex.map(lambda entry: move_entry(entry, output_dir), to_move))
+    sys.stdout.write(f"Moved {len(to_move)} entries to {output_dir}\n")
 
 # Example usage
 input_directory = "/home/ubuntu/Workspace/phat-intern-dev/VinAI/EmerNeRF/data/waymo/processed/training"
 output_directory = "/home/ubuntu/Workspace/phat-intern-dev/VinAI/EmerNeRF/data/waymo/processed/remain"
-process(input_directory, output_directory)
\ No newline at end of file
+process(input_directory, output_directory)